@@ -9,6 +9,7 @@ from enum import Enum
 import logging
 
 # external dependencies
+import numpy as np
 from kubernetes.utils.quantity import parse_quantity
 
 logger = logging.getLogger('iter8_analytics')
@@ -37,47 +38,42 @@ def convert_to_quantity(value):
 
     return str(value)
 
-def gen_round(weights, total):
-    """Given float weights, round them to int weights so that they sum up to a given value.
-    Rounded values equal the original values in expectation.
+def integer_split(weights, total):
+    """Given float weights, split an integer total into int weights proportional to them,
+    so that the int weights sum up to the total.
+    Rounded values equal the original (scaled) values in expectation.
     All inputs are assumed to be non-negative.
 
     Args:
         weights (Sequence[float]): A sequence of float weights
         total (float): Returned values will sum up to Math.floor(total)
 
-    Yields:
-        int: The next weight
+    Returns:
+        numpy.ndarray: An array of int weights, one per input weight
     """
-    # initialize the generator. We will always work with math.floor(total)
     total = math.floor(total)
-
-    def fix(value):
-        """
-        Randomized round of float 'value' to its ceiling or floor
-        """
-        return math.ceil(value) if random() < value - math.floor(value) else math.floor(value)
-
-    def normalize(weights):
-        """Maintain the invariate that weights sum up to 'total'
-
-        Args:
-            weights (Sequence[float]): A sequence of float weights
-
-        Returns:
-            a sequence (Sequence[int]): A sequence of ints summing up to total
-        """
-        if sum(weights) == 0:
-            # weights summing up now to a value > 0
-            weights = [1 for x in weights]
-        weight_sum = sum(weights)
-        return [x*total / weight_sum for x in weights]
-
-    # yield rounded values iteratively and update weights and total after yielding
-    while len(weights) > 0:
-        fixed = fix(normalize(weights)[0])
-        yield fixed
-        weights, total = weights[1:], total - fixed
+    weights = np.asarray(weights, dtype = float)
+    weight_sum = weights.sum()
+    if weight_sum == 0:
+        # all weights are zero; split the total evenly instead
+        weights = np.ones_like(weights)
+        weight_sum = weights.sum()
+    scaled = weights * (total / weight_sum)
+    floored = np.floor(scaled).astype(np.int64)
+    remainder = total - floored.sum()
+    if remainder > 0:
+        # hand out the units lost to flooring by systematic sampling:
+        # lay the fractional parts end to end on [0, remainder), and give one unit to
+        # each weight whose interval contains one of the points offset, offset + 1, ...
+        # for a random offset in [0, 1). Each weight gets an extra unit with probability
+        # equal to its fractional part, and exactly remainder units are handed out.
+        # fractional parts sum up to remainder; clip and pin the ends against rounding errors
+        ends = np.minimum(np.cumsum(scaled - floored), remainder)
+        ends[-1] = remainder
+        offset = random()
+        hits = np.ceil(ends - offset)
+        floored += np.diff(hits, prepend = 0.0).astype(np.int64)
+    return floored
 
 class MessageLevel(str, Enum):
     """
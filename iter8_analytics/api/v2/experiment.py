@@ -3,7 +3,6 @@
 """
 # core python dependencies
 import logging
-import math
 import pprint
 
 # external dependencies
@@ -13,31 +12,39 @@ import numpy as np
 from iter8_analytics.api.v2.types import ExperimentResource, \
     VersionAssessmentsAnalysis, VersionWeight, \
     WinnerAssessmentAnalysis, WinnerAssessmentData, WeightsAnalysis, \
-    Analysis, Objective, TestingPattern, Reward, PreferredDirection
+    Analysis, AggregatedMetric, TestingPattern, PreferredDirection
 from iter8_analytics.api.v2.metrics import get_aggregated_metrics
-from iter8_analytics.api.utils import gen_round
+from iter8_analytics.api.utils import integer_split
 from iter8_analytics.api.utils import Message, MessageLevel
 from iter8_analytics.advancedparams import AdvancedParameters
 
 logger = logging.getLogger('iter8_analytics')
 
+def get_metric_values(aggregated_metric: AggregatedMetric, version_names):
+    """
+    Get values of an aggregated metric for the given versions as a contiguous float array,
+    along with a boolean array indicating which versions have a value.
+    Entries of the values array are nan for versions whose value is unavailable or None;
+    a value that is itself nan is kept, and marked as present.
+    """
+    values = np.full(len(version_names), np.nan)
+    present = np.zeros(len(version_names), dtype = bool)
+    versions_metric_data = aggregated_metric.data
+    for i, name in enumerate(version_names):
+        version_metric = versions_metric_data.get(name)
+        if version_metric is not None and version_metric.value is not None:
+            values[i] = version_metric.value
+            present[i] = True
+    return values, present
+
 def get_version_assessments(experiment_resource: ExperimentResource):
     """
     Get version assessments using experiment resource.
     """
-    versions = [experiment_resource.spec.versionInfo.baseline]
-    if experiment_resource.spec.versionInfo.candidates is not None:
-        versions += experiment_resource.spec.versionInfo.candidates
+    versions = experiment_resource.spec.versionInfo.get_versions()
 
     messages = []
 
-    def check_limits(obj: Objective, value: float):
-        if (obj.upper_limit is not None) and (value > obj.upper_limit):
-            return False
-        if (obj.lower_limit is not None) and (value < obj.lower_limit):
-            return False
-        return True
-
     aggregated_metric_data = experiment_resource.status.analysis.aggregated_metrics.data
 
     version_assessments = VersionAssessmentsAnalysis(data = {})
@@ -45,32 +52,60 @@ def get_version_assessments(experiment_resource: ExperimentResource):
     if experiment_resource.spec.criteria is None:
         return version_assessments
 
-    for version in versions:
-        version_assessments.data[version.name] = [False] * \
-            len(experiment_resource.spec.criteria.objectives)
-
-    for ind, obj in enumerate(experiment_resource.spec.criteria.objectives):
-        if obj.metric in aggregated_metric_data:
-            versions_metric_data = aggregated_metric_data[obj.metric].data
-            for version in versions:
-                if version.name in versions_metric_data:
-                    if versions_metric_data[version.name].value is not None:
-                        version_assessments.data[version.name][ind] = \
-                            check_limits(obj, versions_metric_data[version.name].value)
-                    else:
-                        messages.append(Message(MessageLevel.WARNING, \
-                            f"Value for {obj.metric} metric and {version.name} version is None."))
+    objectives = experiment_resource.spec.criteria.objectives
+    version_names = [version.name for version in versions]
+
+    # assessments[i][j] is True if version i satisfies objective j;
+    # filled in place and converted to per-version lists once at the end
+    assessments = np.zeros((len(versions), len(objectives)), dtype = bool)
+
+    for ind, obj in enumerate(objectives):
+        # resolve each lookup once and branch on the result
+        aggregated_metric = aggregated_metric_data.get(obj.metric)
+        if aggregated_metric is not None:
+            values, present = get_metric_values(aggregated_metric, version_names)
+            for i in np.flatnonzero(~present):
+                name = version_names[i]
+                if name in aggregated_metric.data:
+                    messages.append(Message(MessageLevel.WARNING, \
+                        f"Value for {obj.metric} metric and {name} version is None."))
                 else:
                     messages.append(Message(MessageLevel.WARNING, \
-                        f"Value for {obj.metric} metric and {version.name} version is unavailable."))
+                        f"Value for {obj.metric} metric and {name} version is unavailable."))
+            # check limits for all versions at once; versions without a value never
+            # satisfy an objective, while a nan value violates neither limit
+            satisfied = present.copy()
+            if obj.upper_limit is not None:
+                satisfied &= ~(values > obj.upper_limit)
+            if obj.lower_limit is not None:
+                satisfied &= ~(values < obj.lower_limit)
+            assessments[:, ind] = satisfied
         else:
             messages.append(Message(MessageLevel.WARNING, \
                 f"Aggregated metric object for {obj.metric} metric is unavailable."))
 
+    version_assessments.data = dict(zip(version_names, assessments.tolist()))
     version_assessments.message = Message.join_messages(messages)
-    logger.debug("version assessments: %s", pprint.PrettyPrinter().pformat(version_assessments))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("version assessments: %s", \
+            pprint.PrettyPrinter().pformat(version_assessments))
     return version_assessments
 
+def get_version_feasibility(experiment_resource: ExperimentResource, versions):
+    """
+    Get a list of booleans indicating, for each version, if it satisfies all objectives.
+    """
+    # look up version assessments once, rather than once per version
+    va_data = experiment_resource.status.analysis.version_assessments.data
+    return [all(va_data[version.name]) for version in versions]
+
+def get_feasible_version_names(experiment_resource: ExperimentResource, versions):
+    """
+    Get names of versions that satisfy all objectives, in the order of versions.
+    """
+    feasible = get_version_feasibility(experiment_resource, versions)
+    return [version.name for version, is_feasible in zip(versions, feasible) if is_feasible]
+
 def get_winner_assessment_for_conformance(experiment_resource: ExperimentResource):
     """
     Get winner assessment using experiment resource for Conformance
@@ -79,13 +114,9 @@ def get_winner_assessment_for_conformance(experiment_resource: ExperimentResourc
 
     versions = [experiment_resource.spec.versionInfo.baseline]
 
-    feasible_versions = list(filter(lambda version: \
-    all(experiment_resource.status.analysis.version_assessments.data[version.name]), versions))
-
-    # names of feasible versions
-    fvn = list(map(lambda version: version.name, feasible_versions))
+    feasible = get_version_feasibility(experiment_resource, versions)
 
-    if versions[0].name in fvn:
+    if feasible[0]:
         was.data = WinnerAssessmentData(winnerFound = True, winner = versions[0].name, \
             bestVersions = [versions[0].name])
         was.message = Message.join_messages([Message(MessageLevel.INFO, \
@@ -98,21 +129,16 @@ def get_winner_assessment_for_canarybg(experiment_resource: ExperimentResource):
     """
     was = WinnerAssessmentAnalysis()
 
-    versions = [experiment_resource.spec.versionInfo.baseline]
-    versions += experiment_resource.spec.versionInfo.candidates
-
-    feasible_versions = list(filter(lambda version: \
-    all(experiment_resource.status.analysis.version_assessments.data[version.name]), versions))
+    versions = experiment_resource.spec.versionInfo.get_versions()
 
-    # names of feasible versions
-    fvn = list(map(lambda version: version.name, feasible_versions))
+    feasible = get_version_feasibility(experiment_resource, versions)
 
-    if versions[1].name in fvn:
+    if feasible[1]:
         was.data = WinnerAssessmentData(winnerFound = True, winner = versions[1].name, \
             bestVersions = [versions[1].name])
         was.message = Message.join_messages([Message(MessageLevel.INFO, \
             "candidate satisfies all objectives")])
-    elif versions[0].name in fvn:
+    elif feasible[0]:
         was.data = WinnerAssessmentData(winnerFound = True, winner = versions[0].name, \
             bestVersions = [versions[0].name])
         was.message = Message.join_messages([Message(MessageLevel.INFO, \
@@ -125,71 +151,46 @@ def get_winner_assessment_for_abn(experiment_resource: ExperimentResource):
     """
     was = WinnerAssessmentAnalysis()
 
-    versions = [experiment_resource.spec.versionInfo.baseline]
-    versions += experiment_resource.spec.versionInfo.candidates
-
-    feasible_versions = list(filter(lambda version: \
-    all(experiment_resource.status.analysis.version_assessments.data[version.name]), versions))
+    versions = experiment_resource.spec.versionInfo.get_versions()
 
     # names of feasible versions
-    fvn = list(map(lambda version: version.name, feasible_versions))
-
-    def get_inf_reward(reward: Reward):
-        if reward.preferredDirection == PreferredDirection.HIGH:
-            return -math.inf
-        else:
-            return math.inf
-
-    def first_better_than_second(first: float, second: float, \
-        preferred_direction: PreferredDirection):
-        """
-        Return True if first is better than second, else return False
-        """
-        if preferred_direction is None:
-            err = "Metrics cannot be compared without preferred direction"
-            logger.error(err)
-            return False, err
-        if preferred_direction is PreferredDirection.HIGH:
-            return (first > second), None
-        return (first < second), None
+    fvn = get_feasible_version_names(experiment_resource, versions)
 
     aggregated_metric_data = experiment_resource.status.analysis.aggregated_metrics.data
-    if experiment_resource.spec.criteria.rewards is not None:
-        reward_metric = experiment_resource.spec.criteria.rewards[0].metric
-        if reward_metric in aggregated_metric_data:
-            reward_metric_data = aggregated_metric_data[reward_metric].data
-
-            (top_reward, best_versions) = (get_inf_reward(\
-                experiment_resource.spec.criteria.rewards[0]), [])
-
+    rewards = experiment_resource.spec.criteria.rewards
+    if rewards is not None:
+        reward = rewards[0]
+        aggregated_reward_metric = aggregated_metric_data.get(reward.metric)
+        if aggregated_reward_metric is not None:
             messages = []
 
             if not fvn:
                 messages.append(Message(MessageLevel.INFO, "no version satisfies all objectives"))
 
-            for fver in fvn: # for each feasible version
-                if fver in reward_metric_data:
-                    if reward_metric_data[fver].value is not None:
-                        if reward_metric_data[fver].value == top_reward:
-                            best_versions.append(fver)
-                        else: # this reward not equal to top reward
-                            is_better, err = first_better_than_second(\
-                                reward_metric_data[fver].value, top_reward, \
-                                experiment_resource.spec.criteria.rewards[0].preferredDirection)
-                            if err is None:
-                                if is_better:
-                                    (top_reward, best_versions) = \
-                                        (reward_metric_data[fver].value, [fver])
-                            else: # there is an error in comparison
-                                was.message = Message.join_messages(Message(MessageLevel.ERROR, \
-                                    str(err)))
-                                return was
-                    else: # found a feasible version without reward value
-                        messages.append(Message(MessageLevel.WARNING, \
-                            f"reward value for feasible version {fver} is not available"))
-                else: # found a feasible version without reward value
-                    messages.append(Message(MessageLevel.WARNING, \
-                        f"reward value for feasible version {fver} is not available"))
+            # reward values of feasible versions; nan where unavailable
+            reward_values, has_reward = get_metric_values(aggregated_reward_metric, fvn)
+            for i in np.flatnonzero(~has_reward): # found a feasible version without reward value
+                messages.append(Message(MessageLevel.WARNING, \
+                    f"reward value for feasible version {fvn[i]} is not available"))
+
+            best_versions = []
+            if has_reward.any():
+                preferred_direction = reward.preferredDirection
+                if preferred_direction is None:
+                    err = "Metrics cannot be compared without preferred direction"
+                    logger.error(err)
+                    was.message = Message.join_messages([Message(MessageLevel.ERROR, err)])
+                    return was
+                # a nan reward is never better than, or equal to, another reward
+                comparable = has_reward & ~np.isnan(reward_values)
+                if comparable.any():
+                    if preferred_direction is PreferredDirection.HIGH:
+                        top_reward = reward_values[comparable].max()
+                    else:
+                        top_reward = reward_values[comparable].min()
+                    # all versions attaining the top reward are best versions
+                    best_versions = [fvn[i] \
+                        for i in np.flatnonzero(reward_values == top_reward)]
 
             was.data.bestVersions = best_versions
 
@@ -234,15 +235,16 @@ def get_weights(experiment_resource: ExperimentResource):
         return WeightsAnalysis(data = [], \
             message = "weight computation is not applicable to a conformance experiment")
 
-    versions = [experiment_resource.spec.versionInfo.baseline]
-    versions += experiment_resource.spec.versionInfo.candidates
+    versions = experiment_resource.spec.versionInfo.get_versions()
+    num_versions = len(versions)
 
     messages = []
 
-    # create exploration weights; in fraction
+    # exploration weights are uniform; in fraction
     # if there are three versions:
     #   exploration_weights = [1/3, 1/3, 1/3]
-    exploration_weights = np.full((len(versions), ), 1.0 / len(versions))
+    # only the common value is kept, since it is added to every version
+    exploration_weight = 1.0 / num_versions
 
     def get_exploitation_weights():
         """Create exploitation weights; in fraction
@@ -254,16 +256,16 @@ def get_weights(experiment_resource: ExperimentResource):
           if there are two best versions, say, the 2nd and 3rd versions:
               exploitation_weights = [0, 0.5, 0.5], i.e., best versions get exploited evenly
         """
-        exploitation_weights = np.full((len(versions), ), 0.0)
         try:
             bvs = experiment_resource.status.analysis.winner_assessment.data.bestVersions
             assert len(bvs) > 0
             messages.append(Message(MessageLevel.INFO, "found best version(s)"))
-            for i, version in enumerate(versions):
-                if version.name in bvs:
-                    exploitation_weights[i] = 1/len(bvs)
+            best = set(bvs)
+            is_best = np.fromiter((version.name in best for version in versions), \
+                dtype = bool, count = num_versions)
+            exploitation_weights = is_best / len(bvs)
         except (KeyError, AssertionError):
-            exploitation_weights = np.full((len(versions), ), 0.0)
+            exploitation_weights = np.full((num_versions, ), 0.0)
             exploitation_weights[0] = 1.0
             messages.append(Message(MessageLevel.INFO, "no best version(s) found"))
         return exploitation_weights
@@ -290,30 +292,39 @@ def get_weights(experiment_resource: ExperimentResource):
                 excess = max(0, 10 - 10, 50 - 40) = 10
             after i = 2, constrained_weights = [30, 30, 40]
         """
-        # Suppose there are 3 versions. old_weights initialized to [100, 0, 0]
-        old_weights = [100] + ([0]*(len(versions) - 1))
-        # and then, old_weights are updated to currentWeightDistribution, e.g., [5, 25, 70]
-        if experiment_resource.status.currentWeightDistribution is not None:
-            old_weights = list(map(lambda x: x.value, \
-                experiment_resource.status.currentWeightDistribution))
+        logger.debug("Input weights: %s", input_weights)
+
+        weights_config = experiment_resource.spec.strategy.weights
+        # without a weights configuration, there is nothing to constrain
+        if weights_config is None:
+            return input_weights
+
+        current_weights = experiment_resource.status.currentWeightDistribution
+        if current_weights is not None and len(current_weights) < num_versions:
+            messages.append(Message(MessageLevel.WARNING, \
+                "currentWeightDistribution has fewer entries than versions; ignoring it"))
+            current_weights = None
+        if current_weights is not None:
+            # old_weights are set to currentWeightDistribution, e.g., [5, 25, 70]
+            # only the first num_versions entries are used, one per version
+            old_weights = np.fromiter((x.value for x in current_weights[:num_versions]), \
+                dtype = float, count = num_versions)
+        else:
+            # Suppose there are 3 versions. old_weights are set to [100, 0, 0]
+            old_weights = np.zeros(num_versions)
+            old_weights[0] = 100.0
 
         logger.debug("Old weights: %s", old_weights)
-        logger.debug("Input weights: %s", input_weights)
 
+        # for all candidates at once, compute excess
+        increase = input_weights[1:] - old_weights[1:]
+        excess = np.maximum(0, np.maximum( \
+            increase - weights_config.maxCandidateWeightIncrement, \
+            input_weights[1:] - weights_config.maxCandidateWeight))
+        # cap candidate weights and add the total excess to baseline
         constrained_weights = input_weights.copy()
-        if experiment_resource.spec.strategy.weights is not None:
-            for i in range(len(versions)):
-                if i == 0:
-                    continue
-                # for each candidate, compute excess
-                increase = input_weights[i] - old_weights[i]
-                excess = max(0, \
-                    increase - \
-                    experiment_resource.spec.strategy.weights.maxCandidateWeightIncrement, \
-                    input_weights[i] - experiment_resource.spec.strategy.weights.maxCandidateWeight)
-                # cap candidate weight and add the excess to baseline
-                constrained_weights[i] -= excess
-                constrained_weights[0] += excess
+        constrained_weights[1:] -= excess
+        constrained_weights[0] += excess.sum()
 
         logger.debug("Constrained weights: %s", constrained_weights)
 
@@ -328,23 +339,26 @@ def get_weights(experiment_resource: ExperimentResource):
     #                   = 0.1 * [1/3, 1/3, 1/3] + 0.9 * [0, 0.5, 0.5]
     #                   = [0.033333, 0.033333, 0.033333] + [0.0, 0.45, 0.45]
     #                   = [0.033333, 0.483333, 0.483333]
-    mix_weights = (exploration_weights * ewf) + (exploitation_weights * (1 - ewf))
-
-    # create mix-weight: in percent
+    #
+    # mix-weights are created directly in percent, in a single scaled copy followed by
+    # an in-place add of the uniform exploration part
     # in the above example, we have mix_weights (in percent) = [3.3333, 48.3333, 48.3333]
-    mix_weights *= 100.0
+    mix_weights = exploitation_weights * ((1 - ewf) * 100.0)
+    mix_weights += exploration_weight * ewf * 100.0
 
     # apply weight constraints
     constrained_weights = get_constrained_weights(mix_weights)
 
     # perform rounding of weights, so that they sum up to 100
-    integral_weights = gen_round(constrained_weights, 100)
-    data = []
-    for version in versions:
-        data.append(VersionWeight(name = version.name, value = next(integral_weights)))
+    integral_weights = integer_split(constrained_weights, 100)
+    data = [VersionWeight(name = version.name, value = value) \
+        for version, value in zip(versions, integral_weights.tolist())]
     _weights = WeightsAnalysis(data = data)
-    _weights.message = Message.join_messages([Message(MessageLevel.INFO, "all ok")])
-    logger.debug("weights: %s", pprint.PrettyPrinter().pformat(_weights))
+    if not any(message.level == MessageLevel.WARNING for message in messages):
+        messages.append(Message(MessageLevel.INFO, "all ok"))
+    _weights.message = Message.join_messages(messages)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("weights: %s", pprint.PrettyPrinter().pformat(_weights))
     return _weights
 
 def get_analytics_results(exp_res: ExperimentResource):
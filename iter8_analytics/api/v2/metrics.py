@@ -10,6 +10,9 @@ import pprint
 import base64
 import binascii
 import json
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from threading import Lock
 
 # external module dependencies
 import requests
@@ -24,11 +27,21 @@ from kubernetes import config as kubeconfig
 from iter8_analytics.api.v2.types import AggregatedMetricsAnalysis, ExperimentResource, \
     MetricResource, VersionDetail, AggregatedMetric, VersionMetric, AuthType, Method
 from iter8_analytics.api.utils import Message, MessageLevel
+from iter8_analytics.config import env_config
+import iter8_analytics.constants as constants
 
 logger = logging.getLogger('iter8_analytics')
 
+# metric queries from all requests share this executor,
+# so that the number of queries in flight to metrics backends is bounded service-wide
+metrics_query_executor = ThreadPoolExecutor( \
+    max_workers = env_config[constants.METRICS_QUERY_CONCURRENCY], \
+    thread_name_prefix = "metrics-query")
+
 # cache secrets data for no longer than ten seconds
-@cached(cache=TTLCache(maxsize=1024, ttl=10))
+# the lock guards only cache reads and writes, since metric queries run in multiple threads;
+# concurrent misses for a secret may each fetch it from the cluster
+@cached(cache=TTLCache(maxsize=1024, ttl=10), lock=Lock())
 def get_secret_data(name, namespace):
     """fetch a secret from Kubernetes cluster and return its decoded data"""
     # use in-cluster kubernetes client to fetch secret
@@ -276,10 +289,11 @@ def get_metric_value(metric_resource: MetricResource, version: VersionDetail, st
                 method = metric_resource.spec.method, params = params, body = body, \
                     headers = headers, auth = auth, timeout = 2.0)
             logger.debug("response status code: %s", raw_response.status_code)
-            logger.debug("response text: %s", raw_response.text)
+            # decoding the response text is skipped unless debug logging is enabled
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("response text: %s", raw_response.text)
             response = raw_response.json()
-            logger.debug("json response...")
-            logger.debug(response)
+            logger.debug("json response: %s", response)
         except (requests.exceptions.RequestException, \
             json.decoder.JSONDecodeError, ValueError) as exc:
             logger.error("Error while attempting to get metric value from backend")
@@ -293,9 +307,7 @@ def get_aggregated_metrics(expr: ExperimentResource):
     """
     Get aggregated metrics from experiment resource and metric resources.
     """
-    versions = [expr.spec.versionInfo.baseline]
-    if expr.spec.versionInfo.candidates is not None:
-        versions += expr.spec.versionInfo.candidates
+    versions = expr.spec.versionInfo.get_versions()
 
     # messages not working as intended...
     messages = []
@@ -311,22 +323,31 @@ def get_aggregated_metrics(expr: ExperimentResource):
 
     # if there are metrics to be fetched...
     if expr.status.metrics is not None:
+        # metric queries are independent network calls; issue them concurrently,
+        # one per (metric, version) pair, and consume their results in submission order
+        metric_objs = [metric_resource.metricObj \
+            for metric_resource in expr.status.metrics for _ in versions]
+        query_versions = versions * len(expr.status.metrics)
+        results = metrics_query_executor.map(get_metric_value, \
+            metric_objs, query_versions, repeat(expr.status.startTime))
+
         for metric_resource in expr.status.metrics:
-            iam.data[metric_resource.name] = AggregatedMetric(data = {})
-            # fetch the metric value for each version...
+            # bind the per-metric objects locally instead of re-walking iam.data
+            aggregated_metric = iam.data[metric_resource.name] = AggregatedMetric(data = {})
+            # collect the fetched metric value for each version...
             for version in versions:
                 # initialize metric object for this version...
-                iam.data[metric_resource.name].data[version.name] = VersionMetric()
-                val, err = get_metric_value(metric_resource.metricObj, version, \
-                expr.status.startTime)
+                version_metric = aggregated_metric.data[version.name] = VersionMetric()
+                val, err = next(results)
                 if err is None:
-                    iam.data[metric_resource.name].data[version.name].value = val
+                    version_metric.value = val
                 else:
                     messages.append(Message(MessageLevel.ERROR, \
                         f"Error from metrics backend for metric: {metric_resource.name} \
                             and version: {version.name}"))
 
     iam.message = Message.join_messages(messages)
-    logger.debug("Analysis object after metrics collection")
-    logger.debug(pprint.PrettyPrinter().pformat(iam))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Analysis object after metrics collection: %s", \
+            pprint.PrettyPrinter().pformat(iam))
     return iam
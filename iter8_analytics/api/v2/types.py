@@ -87,6 +87,14 @@ class VersionInfo(BaseModel):
     baseline: VersionDetail = Field(..., description = "baseline version")
     candidates: Sequence[VersionDetail] = Field(None, description = "a list of candidate versions")
 
+    def get_versions(self):
+        """
+        Get a list of all versions, with baseline followed by candidates
+        """
+        if self.candidates is None:
+            return [self.baseline]
+        return [self.baseline, *self.candidates]
+
 class PreferredDirection(str, Enum):
     """
     Preferred directions for a metric
@@ -24,6 +24,29 @@ def get_env_config():
         "The iter8 analytics server will listen on port %s", \
             config[constants.ANALYTICS_SERVICE_PORT])
 
+    # maximum number of metric queries in flight to metrics backends, across all requests
+    # override with environment variable
+    concurrency = os.getenv(constants.METRICS_QUERY_CONCURRENCY_ENV, \
+        str(constants.METRICS_QUERY_CONCURRENCY_DEFAULT))
+    try:
+        concurrency = int(concurrency)
+    except ValueError:
+        logging.getLogger(__name__).warning(\
+            "Invalid value %s for %s; using the default value %s", concurrency, \
+                constants.METRICS_QUERY_CONCURRENCY_ENV, \
+                    constants.METRICS_QUERY_CONCURRENCY_DEFAULT)
+        concurrency = constants.METRICS_QUERY_CONCURRENCY_DEFAULT
+    if concurrency < 1:
+        logging.getLogger(__name__).warning(\
+            "Value %s for %s is less than 1; using 1", concurrency, \
+                constants.METRICS_QUERY_CONCURRENCY_ENV)
+        concurrency = 1
+    config[constants.METRICS_QUERY_CONCURRENCY] = concurrency
+    # log result
+    logging.getLogger(__name__).info(\
+        "The iter8 analytics server will issue at most %s concurrent metric queries", \
+            config[constants.METRICS_QUERY_CONCURRENCY])
+
     return config
 
 env_config = get_env_config()
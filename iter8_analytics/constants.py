@@ -10,3 +10,7 @@ ANALYTICS_SERVICE_PORT = 'ANALYTICS_SERVICE_PORT'
 ANALYTICS_SERVICE_DEFAULT_PORT = 8080
 ANALYTICS_SERVICE_CONFIGFILE_PORT = 'port'
 ANALYTICS_SERVICE_PORT_ENV = 'ITER8_ANALYTICS_SERVER_PORT'
+
+METRICS_QUERY_CONCURRENCY = 'metrics_query_concurrency'
+METRICS_QUERY_CONCURRENCY_DEFAULT = 16
+METRICS_QUERY_CONCURRENCY_ENV = 'ITER8_ANALYTICS_METRICS_QUERY_CONCURRENCY'
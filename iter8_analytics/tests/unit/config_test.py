@@ -0,0 +1,24 @@
+"""Tests for module iter8_analytics.config"""
+# standard python stuff
+import os
+from unittest import mock
+
+from iter8_analytics.config import get_env_config
+import iter8_analytics.constants as constants
+
+def get_metrics_query_concurrency(value):
+    """get metrics query concurrency with the given value of its environment variable"""
+    with mock.patch.dict(os.environ, {constants.METRICS_QUERY_CONCURRENCY_ENV: value}):
+        return get_env_config()[constants.METRICS_QUERY_CONCURRENCY]
+
+def test_metrics_query_concurrency():
+    with mock.patch.dict(os.environ):
+        os.environ.pop(constants.METRICS_QUERY_CONCURRENCY_ENV, None)
+        assert get_env_config()[constants.METRICS_QUERY_CONCURRENCY] == \
+            constants.METRICS_QUERY_CONCURRENCY_DEFAULT
+    assert get_metrics_query_concurrency("4") == 4
+
+def test_invalid_metrics_query_concurrency():
+    assert get_metrics_query_concurrency("many") == constants.METRICS_QUERY_CONCURRENCY_DEFAULT
+    assert get_metrics_query_concurrency("0") == 1
+    assert get_metrics_query_concurrency("-3") == 1
@@ -0,0 +1,33 @@
+"""Tests for module iter8_analytics.api.utils"""
+# iter8 dependencies
+from iter8_analytics.api.utils import integer_split
+from iter8_analytics.api.v2.types import VersionWeight
+
+def test_integer_split():
+    assert integer_split([0.0, 0.0], 100).tolist() == [50, 50]
+    assert integer_split([1.0, 3.0], 100.5).tolist() == [25, 75]
+
+def test_integer_split_is_fair():
+    # 30 versions, no winner: every version gets a share of exploration traffic
+    weights = [90 + 10/30] + [10/30] * 29
+    splits = [integer_split(weights, 100) for _ in range(200)]
+    for split in splits:
+        assert split.sum() == 100
+        assert all(abs(value - weight) < 1 for value, weight in zip(split, weights))
+    # a weight with a non-zero float value is not always rounded to 0
+    assert all(any(split[i] > 0 for split in splits) for i in range(len(weights)))
+
+    # canary is the winner: baseline and the other candidate are not stuck at 3
+    weights = [10/3, 90 + 10/3, 10/3]
+    splits = [integer_split(weights, 100) for _ in range(200)]
+    assert all(split.sum() == 100 for split in splits)
+    assert any(split[0] == 4 for split in splits)
+    assert any(split[2] == 4 for split in splits)
+
+def test_integer_split_values_are_python_ints():
+    values = integer_split([10/3, 90 + 10/3, 10/3], 100).tolist()
+    assert all(type(value) is int for value in values)
+    for value in values:
+        weight = VersionWeight(name = "version", value = value)
+        assert type(weight.value) is int
+        assert weight.json() == f'{{"name": "version", "value": {value}}}'
@@ -47,6 +47,16 @@ def test_v2_input_object():
     ExperimentResource(** er_example_step2)
     ExperimentResource(** er_example_step3)
 
+def test_v2_get_versions():
+    expr = ExperimentResource(** er_example)
+    assert [version.name for version in expr.spec.versionInfo.get_versions()] == \
+        ['default', 'canary']
+
+    example = copy.deepcopy(er_example)
+    del example['spec']['versionInfo']['candidates']
+    expr = ExperimentResource(** example)
+    assert [version.name for version in expr.spec.versionInfo.get_versions()] == ['default']
+
 def test_experiment_response_objects():
     AggregatedMetricsAnalysis(** am_response)
     VersionAssessmentsAnalysis(** va_response)
@@ -235,6 +245,16 @@ def test_v2_va_without_mean_latency_metric():
     assert resp.message == \
         "Error: ; Warning: Aggregated metric object for mean-latency metric is unavailable.; Info: "
 
+def test_v2_va_with_nan_metric_value():
+    expr = ExperimentResource(** er_example_step1).convert_to_float()
+    expr.status.analysis.aggregated_metrics.data['mean-latency'] \
+        .data['canary'].value = float('nan')
+    resp = get_version_assessments(expr)
+    # a nan value is present; it violates neither limit, as in check_limits comparisons
+    assert resp.data == {'default': [True], 'canary': [True]}
+    assert "is None" not in resp.message
+    assert "is unavailable" not in resp.message
+
 def test_v2_canary_passing_criteria():
     example = copy.deepcopy(er_example_step1)
     example['spec']['criteria']['objectives'][0]['upperLimit'] = 500
@@ -432,6 +452,40 @@ def test_v2_set_weights_config():
     resp = get_weights(expr.convert_to_float())
     assert resp.data == expected_resp
 
+def test_v2_weights_with_mismatched_current_weights():
+    example = copy.deepcopy(er_example_step3)
+    example['spec']['strategy']['weights'] = {
+        "maxCandidateWeight": 53,
+        "maxCandidateWeightIncrement": 2
+    }
+
+    # extra entries in currentWeightDistribution are ignored
+    example['status']['currentWeightDistribution'] = [
+        {"name": "default", "value": 50},
+        {"name": "canary", "value": 50},
+        {"name": "extra", "value": 0}
+    ]
+    expr = ExperimentResource(** example)
+    resp = get_weights(expr.convert_to_float())
+    assert resp.data == [
+        VersionWeight(name="default", value=48),
+        VersionWeight(name="canary", value=52)
+    ]
+    assert "currentWeightDistribution" not in resp.message
+
+    # too few entries in currentWeightDistribution; baseline is assumed to have all traffic
+    example['status']['currentWeightDistribution'] = [
+        {"name": "default", "value": 50}
+    ]
+    expr = ExperimentResource(** example)
+    resp = get_weights(expr.convert_to_float())
+    assert resp.data == [
+        VersionWeight(name="default", value=98),
+        VersionWeight(name="canary", value=2)
+    ]
+    assert "Warning: currentWeightDistribution has fewer entries than versions; ignoring it" \
+        in resp.message
+
 ########## A/B TESTS #############
 def test_v2_ab_input_object():
     ExperimentResource(** ab_er_example)
@@ -747,3 +801,41 @@ def test_v2_abn_with_better_reward_but_not_feasible():
     resp = get_winner_assessment(expr.convert_to_float())
     assert resp.data.winnerFound is True
     assert resp.data.winner == 'canary2'
+
+def test_v2_abn_with_low_preferred_direction():
+    example = copy.deepcopy(abn_er_example_step2)
+
+    example['spec']['criteria']['rewards'][0]['preferredDirection'] = 'Low'
+    expr = ExperimentResource(** example)
+    resp = get_winner_assessment(expr.convert_to_float())
+    assert resp.data.winnerFound is True
+    assert resp.data.winner == 'default'
+
+def test_v2_abn_with_tied_rewards():
+    example = copy.deepcopy(abn_er_example_step2)
+
+    example['status']['analysis']['aggregatedMetrics']['data']['business-revenue'] \
+        ['data']['canary2']['value'] = 3343.2343
+    expr = ExperimentResource(** example)
+    resp = get_winner_assessment(expr.convert_to_float())
+    assert resp.data.winnerFound is False
+    assert resp.data.bestVersions == ['canary1', 'canary2']
+
+def test_v2_abn_set_weights_config():
+    example = copy.deepcopy(abn_er_example_step3)
+    example['status']['currentWeightDistribution'] = [
+        {"name": "default", "value": 50},
+        {"name": "canary1", "value": 25},
+        {"name": "canary2", "value": 25}
+    ]
+    example['spec']['strategy']['weights'] = {
+        "maxCandidateWeight": 20,
+        "maxCandidateWeightIncrement": 10
+    }
+    expr = ExperimentResource(** example)
+    resp = get_weights(expr.convert_to_float())
+    # constrained weights (in percent) are [76.667, 3.333, 20]; each is rounded up or down
+    assert [weight.name for weight in resp.data] == ['default', 'canary1', 'canary2']
+    assert sum(weight.value for weight in resp.data) == 100
+    for weight, expected in zip(resp.data, [76.667, 3.333, 20]):
+        assert abs(weight.value - expected) < 1
@@ -4,6 +4,9 @@ import logging
 import re
 import os
 import json
+import time
+import base64
+import threading
 from unittest import TestCase, mock
 
 # python libraries
@@ -18,7 +21,7 @@ from iter8_analytics.config import env_config
 import iter8_analytics.constants as constants
 
 from iter8_analytics.api.v2.metrics import get_params, get_url, get_headers, \
-    get_basic_auth, get_body, get_metric_value
+    get_basic_auth, get_body, get_metric_value, get_aggregated_metrics, get_secret_data
 from iter8_analytics.api.v2.types import ExperimentResource, MetricInfo, \
     MetricResource, NamedValue, AuthType
 from iter8_analytics.api.v2.examples.examples_canary import er_example
@@ -599,3 +602,95 @@ class SamplesUsedInIter8Docs(TestCase):
             value, err = get_metric_value(ela, version, start_time)
             assert err is None
             assert value == 128.33333333333334
+
+class ConcurrentMetricQueries(TestCase):
+    """Test aggregated metrics collected from concurrent metric queries"""
+
+    def test_submission_order(self):
+        """values and error messages must follow metric and version order"""
+        metric_names = ["metric-a", "metric-b", "metric-c"]
+        version_names = ["default", "canary1", "canary2"]
+        metrics = [{
+            "name": metric_name,
+            "metricObj": {
+                "spec": {
+                    "urlTemplate": f"http://{metric_name}.test/api",
+                    "params": [{"name": "version", "value": "${name}"}],
+                    "jqExpression": ".value"
+                }
+            }
+        } for metric_name in metric_names]
+        expr = ExperimentResource(** {
+            "spec": {
+                "strategy": {"testingPattern": "A/B/N"},
+                "versionInfo": {
+                    "baseline": {"name": version_names[0]},
+                    "candidates": [{"name": name} for name in version_names[1:]]
+                }
+            },
+            "status": {
+                "startTime": "2020-04-03T12:55:50.568Z",
+                "metrics": metrics
+            }
+        })
+
+        def respond(request, context):
+            """respond to earlier queries later, so that queries complete out of order"""
+            i = metric_names.index(request.hostname.split(".")[0])
+            j = version_names.index(request.qs["version"][0])
+            time.sleep(0.01 * (8 - (3 * i + j)))
+            context.status_code = 200
+            if j == 1 and i != 1: # no value for canary1 in metric-a and metric-c
+                return {}
+            return {"value": 10 * i + j}
+
+        with requests_mock.mock(real_http=True) as req_mock:
+            for metric_name in metric_names:
+                req_mock.get(f"http://{metric_name}.test/api", json = respond)
+            iam = get_aggregated_metrics(expr)
+
+        assert list(iam.data) == metric_names
+        for i, metric_name in enumerate(metric_names):
+            assert list(iam.data[metric_name].data) == version_names
+            for j, version_name in enumerate(version_names):
+                expected = None if (j == 1 and i != 1) else 10 * i + j
+                assert iam.data[metric_name].data[version_name].value == expected
+        errors = re.findall("metric: ([\\w-]+)\\s+and version: ([\\w-]+)", iam.message)
+        assert errors == [("metric-a", "canary1"), ("metric-c", "canary1")]
+
+class ConcurrentSecretFetches(TestCase):
+    """Test secrets fetched from Kubernetes cluster by concurrent metric queries"""
+
+    @mock.patch('iter8_analytics.api.v2.metrics.kubeconfig.load_incluster_config')
+    @mock.patch('iter8_analytics.api.v2.metrics.kubeclient.CoreV1Api')
+    def test_slow_fetch_does_not_block_others(self, mock_core, _):
+        """a slow fetch of one secret must not block the fetch of another secret"""
+        slow_fetch_started = threading.Event()
+        release_slow_fetch = threading.Event()
+
+        def read_namespaced_secret(name, namespace):
+            if name == "slow-secret":
+                slow_fetch_started.set()
+                release_slow_fetch.wait(timeout = 5)
+            return mock.Mock(data = {"token": base64.b64encode(name.encode()).decode()})
+        mock_core.return_value.read_namespaced_secret.side_effect = read_namespaced_secret
+
+        results = {}
+        def fetch(name):
+            results[name] = get_secret_data(name, "concurrent-fetch-test")
+
+        slow = threading.Thread(target = fetch, args = ("slow-secret",))
+        slow.start()
+        assert slow_fetch_started.wait(timeout = 5)
+
+        fast = threading.Thread(target = fetch, args = ("fast-secret",))
+        fast.start()
+        fast.join(timeout = 2)
+        try:
+            assert not fast.is_alive()
+            assert slow.is_alive()
+            assert results["fast-secret"] == ({"token": "fast-secret"}, None)
+        finally:
+            release_slow_fetch.set()
+            slow.join(timeout = 5)
+        assert results["slow-secret"] == ({"token": "slow-secret"}, None)